@@ -4,15 +4,21 @@
 import sys
 import os
 import logging
+import logging.handlers
+import atexit
+import functools
 import json
 import time
-import traceback
-from datetime import datetime, timedelta, timezone
+import math
+import random
+from datetime import datetime
 import threading
-from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+from collections import deque
 import socket
-import urllib.parse
-import http.client
+import signal
+from array import array
 
 # First, define required modules
 required_modules = [
@@ -25,10 +31,11 @@ required_modules = [
 # Optional modules for optional features
 # We'll set these to None and import them conditionally
 InfluxDBClient = None
-SYNCHRONOUS = None
+WriteOptions = None
 mqtt = None
 cv2 = None
 np = None
+orjson = None
 
 # Attempt to import required modules
 missing_modules = []
@@ -50,8 +57,23 @@ if missing_modules:
 import usb.core
 import usb.util
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import schedule
 
+# Shared HTTP session so repeated API calls reuse kept-alive connections
+http_session = requests.Session()
+http_session.headers.update({"User-Agent": "NoiseBuster/1"})
+# Transient connection failures and gateway errors are retried with backoff inside the pool
+http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(
+    total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False))
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+# (connect, read) timeout in seconds for every outgoing HTTP request
+HTTP_TIMEOUT = (3, 5)
+# Telraam aggregates traffic counts server-side and can take longer to answer
+TELRAAM_HTTP_TIMEOUT = (3, 10)
+
 # Now load the configuration
 def load_config(config_path):
     with open(config_path, 'r') as config_file:
@@ -78,6 +100,7 @@ DEVICE_AND_NOISE_MONITORING_CONFIG = config.get("DEVICE_AND_NOISE_MONITORING_CON
 TELRAAM_API_CONFIG = config.get("TELRAAM_API_CONFIG", {})
 TIMEZONE_CONFIG = config.get("TIMEZONE_CONFIG", {})
 DISCORD_CONFIG = config.get("DISCORD_CONFIG", {})
+LOGGING_CONFIG = config.get("LOGGING_CONFIG", {})
 
 # Retrieve USB device IDs from the configuration (if specified)
 usb_vendor_id = DEVICE_AND_NOISE_MONITORING_CONFIG.get("usb_vendor_id", "")
@@ -100,40 +123,69 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = '\033[0m'
 
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        # One formatter per level with the color codes baked into its format string
+        self.level_formatters = {
+            levelname: logging.Formatter(f"{color}{self._fmt}{self.RESET}", datefmt)
+            for levelname, color in self.COLORS.items()
+        }
+
     def format(self, record):
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.msg = f"{color}{record.msg}{self.RESET}"
-        return super().format(record)
+        # Color the formatted line instead of record.msg, which other handlers share
+        level_formatter = self.level_formatters.get(record.levelname)
+        if level_formatter is None:
+            return super().format(record)
+        return level_formatter.format(record)
+
+# Console verbosity from the configuration; WARNING keeps routine messages off a busy console
+console_level_name = str(LOGGING_CONFIG.get("console_level", "INFO")).upper()
+console_level = logging.getLevelName(console_level_name)
+console_level_valid = isinstance(console_level, int)
+if not console_level_valid:
+    console_level = logging.INFO
 
 # Configure logging level and output format
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)  # Set to DEBUG to capture all logs in file
+# DEBUG records are dropped before any formatting unless the console asks for them
+logger.setLevel(min(console_level, logging.INFO))
 
-# Create console handler with a higher log level
+# Create console handler with the configured log level
 ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
+ch.setLevel(console_level)
 
 # Create formatter and add it to the console handler
 console_formatter = ColoredFormatter('%(asctime)s - %(levelname)s - %(message)s')
 ch.setFormatter(console_formatter)
 
-# Create file handler to log to 'noisebuster.log'
-fh = logging.FileHandler('noisebuster.log')
-fh.setLevel(logging.DEBUG)  # Log all levels to the file
+# Create file handler to log to 'noisebuster.log', rotated so it cannot fill the disk
+fh = logging.handlers.RotatingFileHandler('noisebuster.log', maxBytes=10 * 1024 * 1024, backupCount=3)
+fh.setLevel(logging.INFO)
 
 # Create formatter and add it to the file handler
 file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 fh.setFormatter(file_formatter)
 
+# Hand file records to a background listener so disk writes never block the sampling thread
+log_queue = Queue()
+qh = logging.handlers.QueueHandler(log_queue)
+qh.setLevel(logging.INFO)
+log_listener = logging.handlers.QueueListener(log_queue, fh, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 # Add the handlers to the logger
 logger.addHandler(ch)
-logger.addHandler(fh)
+logger.addHandler(qh)
+
+if not console_level_valid:
+    logger.warning(f"Invalid LOGGING_CONFIG 'console_level' '{console_level_name}'. Falling back to 'INFO'.")
 
 logger.info("Detailed logs are saved in 'noisebuster.log'.")
 
-# Load USB IDs for known sound meters from file
+# Load USB IDs for known sound meters from file, keyed by (vendor ID, product ID)
 def load_usb_ids(usb_ids_path):
-    usb_ids = []
+    usb_ids = {}
     try:
         with open(usb_ids_path, 'r') as usb_ids_file:
             for line in usb_ids_file:
@@ -148,7 +200,7 @@ def load_usb_ids(usb_ids_path):
                     model = comment.strip() if comment else "Unknown model"
                     vendor_id = int(vendor_id_str, 16)
                     product_id = int(product_id_str, 16)
-                    usb_ids.append((vendor_id, product_id, model))
+                    usb_ids[(vendor_id, product_id)] = model
                 else:
                     logger.warning(f"Incorrect format in USB IDs file: {line.strip()}")
     except FileNotFoundError:
@@ -159,15 +211,15 @@ usb_ids = load_usb_ids('usb_ids')
 
 # Now, attempt to import optional modules if the corresponding feature is enabled
 def import_optional_modules():
-    global InfluxDBClient, SYNCHRONOUS, mqtt, cv2, np
+    global InfluxDBClient, WriteOptions, mqtt, cv2, np, orjson
     missing_optional_modules = []
 
     if INFLUXDB_CONFIG.get("enabled"):
         try:
             from influxdb_client import InfluxDBClient as InfluxDBClientImported
-            from influxdb_client.client.write_api import SYNCHRONOUS as SYNCHRONOUS_IMPORTED
+            from influxdb_client.client.write_api import WriteOptions as WriteOptionsImported
             InfluxDBClient = InfluxDBClientImported
-            SYNCHRONOUS = SYNCHRONOUS_IMPORTED
+            WriteOptions = WriteOptionsImported
         except ImportError as e:
             logger.error("InfluxDB client library is not installed. Please install 'influxdb-client' package.")
             missing_optional_modules.append('influxdb_client')
@@ -190,131 +242,79 @@ def import_optional_modules():
             logger.error("OpenCV or numpy library is not installed. Please install 'opencv-python' and 'numpy' packages.")
             missing_optional_modules.append('opencv-python, numpy')
 
+    # orjson is only a faster JSON encoder; fall back to the json module silently when it is absent
+    try:
+        import orjson as orjson_imported
+        orjson = orjson_imported
+    except ImportError:
+        pass
+
     return missing_optional_modules
 
 missing_optional_modules = import_optional_modules()
 
-# Now proceed to check the configurations
-def check_configuration():
-    logger.info("Checking configuration...")
-
-    # Check InfluxDB configuration
-    if INFLUXDB_CONFIG.get("enabled"):
-        influxdb_missing_fields = []
-        required_fields = ["host", "port", "token", "org", "bucket", "realtime_bucket"]
-        for field in required_fields:
-            if not INFLUXDB_CONFIG.get(field) or (isinstance(INFLUXDB_CONFIG.get(field), str) and INFLUXDB_CONFIG.get(field).startswith("<YOUR_")):
-                influxdb_missing_fields.append(field)
-        # Check if bucket names are exactly as specified
-        bucket_name = INFLUXDB_CONFIG.get("bucket", "")
-        realtime_bucket_name = INFLUXDB_CONFIG.get("realtime_bucket", "")
-        if bucket_name != "noise_buster":
-            logger.error("InfluxDB 'bucket' must be 'noise_buster'. Please use the correct bucket name.")
-            influxdb_missing_fields.append('bucket')
-        if realtime_bucket_name != "noise_buster_realtime":
-            logger.error("InfluxDB 'realtime_bucket' must be 'noise_buster_realtime'. Please use the correct bucket name.")
-            influxdb_missing_fields.append('realtime_bucket')
-        if influxdb_missing_fields:
-            logger.error(f"InfluxDB is enabled but missing or misconfigured required settings: {', '.join(influxdb_missing_fields)}. Feature will be disabled.")
-            INFLUXDB_CONFIG["enabled"] = False
-        else:
-            logger.info("InfluxDB is enabled and properly configured.")
-    else:
-        logger.info("InfluxDB is disabled.")
+def json_dumps(obj):
+    """Serialize obj to UTF-8 JSON bytes, ready to publish, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
 
-    # Check Pushover configuration
-    if PUSHOVER_CONFIG.get("enabled"):
-        pushover_missing_fields = []
-        required_fields = ["user_key", "api_token"]
-        for field in required_fields:
-            if not PUSHOVER_CONFIG.get(field) or PUSHOVER_CONFIG.get(field).startswith("<YOUR_"):
-                pushover_missing_fields.append(field)
-        if pushover_missing_fields:
-            logger.error(f"Pushover is enabled but missing required configurations: {', '.join(pushover_missing_fields)}. Feature will be disabled.")
-            PUSHOVER_CONFIG["enabled"] = False
-        else:
-            logger.info("Pushover is enabled and properly configured.")
-    else:
-        logger.info("Pushover is disabled.")
-
-    # Check Weather configuration
-    if WEATHER_CONFIG.get("enabled"):
-        weather_missing_fields = []
-        required_fields = ["api_key", "api_url", "location"]
-        for field in required_fields:
-            if not WEATHER_CONFIG.get(field) or WEATHER_CONFIG.get(field).startswith("<YOUR_"):
-                weather_missing_fields.append(field)
-        if weather_missing_fields:
-            logger.error(f"Weather data collection is enabled but missing required configurations: {', '.join(weather_missing_fields)}. Feature will be disabled.")
-            WEATHER_CONFIG["enabled"] = False
-        else:
-            logger.info("Weather data collection is enabled and properly configured.")
-    else:
-        logger.info("Weather data collection is disabled.")
+def json_loads(data):
+    """Deserialize a JSON document, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
 
-    # Check MQTT configuration
-    if MQTT_CONFIG.get("enabled"):
-        mqtt_missing_fields = []
-        required_fields = ["server", "port"]
-        for field in required_fields:
-            if not MQTT_CONFIG.get(field):
-                mqtt_missing_fields.append(field)
-        if not MQTT_CONFIG.get("user") or MQTT_CONFIG.get("user").startswith("<YOUR_"):
-            logger.warning("MQTT 'user' is not set. It's recommended to set a username.")
-        if not MQTT_CONFIG.get("password") or MQTT_CONFIG.get("password").startswith("<YOUR_"):
-            logger.warning("MQTT 'password' is not set. It's recommended to set a password.")
-        if mqtt_missing_fields:
-            logger.error(f"MQTT is enabled but missing required configurations: {', '.join(mqtt_missing_fields)}. Feature will be disabled.")
-            MQTT_CONFIG["enabled"] = False
-        else:
-            logger.info("MQTT is enabled and properly configured.")
-    else:
-        logger.info("MQTT is disabled.")
+# Now proceed to check the configurations
+def is_unset(value):
+    """Return True if a configuration value is missing or still a '<YOUR_...>' placeholder."""
+    return not value or (isinstance(value, str) and value.startswith("<YOUR_"))
+
+def check_influxdb_buckets(section):
+    """Return InfluxDB bucket settings that do not use the expected bucket names."""
+    misconfigured_fields = []
+    if section.get("bucket", "") != "noise_buster":
+        logger.error("InfluxDB 'bucket' must be 'noise_buster'. Please use the correct bucket name.")
+        misconfigured_fields.append('bucket')
+    if section.get("realtime_bucket", "") != "noise_buster_realtime":
+        logger.error("InfluxDB 'realtime_bucket' must be 'noise_buster_realtime'. Please use the correct bucket name.")
+        misconfigured_fields.append('realtime_bucket')
+    return misconfigured_fields
+
+def check_mqtt_credentials(section):
+    """Warn about missing MQTT credentials, which are recommended but not required."""
+    for field, description in (("user", "username"), ("password", "password")):
+        if is_unset(section.get(field)):
+            logger.warning(f"MQTT '{field}' is not set. It's recommended to set a {description}.")
+    return []
+
+# Optional features: display name, config section, enabling flag, required settings and an extra check
+CONFIG_SCHEMA = [
+    ("InfluxDB", INFLUXDB_CONFIG, "enabled", ["host", "port", "token", "org", "bucket", "realtime_bucket"], check_influxdb_buckets),
+    ("Pushover", PUSHOVER_CONFIG, "enabled", ["user_key", "api_token"], None),
+    ("Weather data collection", WEATHER_CONFIG, "enabled", ["api_key", "api_url", "location"], None),
+    ("MQTT", MQTT_CONFIG, "enabled", ["server", "port"], check_mqtt_credentials),
+    ("IP Camera", CAMERA_CONFIG, "use_ip_camera", ["ip_camera_url", "ip_camera_protocol"], None),
+    ("Telraam data collection", TELRAAM_API_CONFIG, "enabled", ["api_key", "segment_id"], None),
+    ("Discord", DISCORD_CONFIG, "enabled", ["webhook_url"], None),
+]
 
-    # Check Camera configuration
-    if CAMERA_CONFIG.get("use_ip_camera"):
-        camera_missing_fields = []
-        required_fields = ["ip_camera_url", "ip_camera_protocol"]
-        for field in required_fields:
-            if not CAMERA_CONFIG.get(field):
-                camera_missing_fields.append(field)
-        if camera_missing_fields:
-            logger.error(f"IP Camera is enabled but missing required configurations: {', '.join(camera_missing_fields)}. Feature will be disabled.")
-            CAMERA_CONFIG["use_ip_camera"] = False
-        else:
-            logger.info("IP Camera is enabled and properly configured.")
-    else:
-        logger.info("IP Camera is disabled.")
-
-    # Check Telraam configuration
-    if TELRAAM_API_CONFIG.get("enabled"):
-        telraam_missing_fields = []
-        required_fields = ["api_key", "segment_id"]
-        for field in required_fields:
-            if not TELRAAM_API_CONFIG.get(field) or TELRAAM_API_CONFIG.get(field).startswith("<YOUR_"):
-                telraam_missing_fields.append(field)
-        if telraam_missing_fields:
-            logger.error(f"Telraam data collection is enabled but missing required configurations: {', '.join(telraam_missing_fields)}. Feature will be disabled.")
-            TELRAAM_API_CONFIG["enabled"] = False
-        else:
-            logger.info("Telraam data collection is enabled and properly configured.")
-    else:
-        logger.info("Telraam data collection is disabled.")
+def check_configuration():
+    logger.info("Checking configuration...")
 
-    # Check Discord configuration
-    if DISCORD_CONFIG.get("enabled"):
-        discord_missing_fields = []
-        required_fields = ["webhook_url"]
-        for field in required_fields:
-            if not DISCORD_CONFIG.get(field) or DISCORD_CONFIG.get(field).startswith("<YOUR_"):
-                discord_missing_fields.append(field)
-        if discord_missing_fields:
-            logger.error(f"Discord notifications are enabled but missing required configurations: {', '.join(discord_missing_fields)}. Feature will be disabled.")
-            DISCORD_CONFIG["enabled"] = False
+    # Disable any enabled feature whose required settings are missing or left as placeholders
+    for name, section, flag, required_fields, extra_check in CONFIG_SCHEMA:
+        if not section.get(flag):
+            logger.info(f"{name} is disabled.")
+            continue
+        missing_fields = [field for field in required_fields if is_unset(section.get(field))]
+        if extra_check:
+            missing_fields += [field for field in extra_check(section) if field not in missing_fields]
+        if missing_fields:
+            logger.error(f"{name} is enabled but missing or misconfigured required settings: {', '.join(missing_fields)}. Feature will be disabled.")
+            section[flag] = False
         else:
-            logger.info("Discord notifications are enabled and properly configured.")
-    else:
-        logger.info("Discord notifications are disabled.")
+            logger.info(f"{name} is enabled and properly configured.")
 
     # Check Device and Noise Monitoring configuration
     if not DEVICE_AND_NOISE_MONITORING_CONFIG.get("minimum_noise_level"):
@@ -327,41 +327,83 @@ def check_configuration():
 
 check_configuration()
 
-# Global variable to keep track of device detection status
+# Values used on every sampling window, resolved once after the configuration is checked
+DEVICE_NAME = DEVICE_AND_NOISE_MONITORING_CONFIG.get("device_name", "noise_buster_device")
+MINIMUM_NOISE_LEVEL = DEVICE_AND_NOISE_MONITORING_CONFIG['minimum_noise_level']
+TIME_WINDOW_DURATION = DEVICE_AND_NOISE_MONITORING_CONFIG['time_window_duration']
+REALTIME_TOPIC = f"homeassistant/sensor/{DEVICE_NAME}/realtime_noise_levels/state"
+EVENT_TOPIC = f"homeassistant/sensor/{DEVICE_NAME}/noise_levels/state"
+# Realtime readings are only republished on a large enough change and/or once the interval has passed;
+# 0 disables a criterion, and with both disabled every window is published
+REALTIME_MIN_CHANGE_DB = MQTT_CONFIG.get("realtime_min_change_db", 0)
+if isinstance(REALTIME_MIN_CHANGE_DB, bool) or not isinstance(REALTIME_MIN_CHANGE_DB, (int, float)) or REALTIME_MIN_CHANGE_DB < 0:
+    logger.warning(f"Invalid MQTT 'realtime_min_change_db' '{REALTIME_MIN_CHANGE_DB}'. It must be a number of dB >= 0. Falling back to 0.")
+    REALTIME_MIN_CHANGE_DB = 0
+REALTIME_MAX_INTERVAL = MQTT_CONFIG.get("realtime_max_interval", 0)
+if isinstance(REALTIME_MAX_INTERVAL, bool) or not isinstance(REALTIME_MAX_INTERVAL, (int, float)) or REALTIME_MAX_INTERVAL < 0:
+    logger.warning(f"Invalid MQTT 'realtime_max_interval' '{REALTIME_MAX_INTERVAL}'. It must be a number of seconds >= 0. Falling back to 0.")
+    REALTIME_MAX_INTERVAL = 0
+REALTIME_MAX_INTERVAL_NS = int(REALTIME_MAX_INTERVAL * 1_000_000_000)
+REALTIME_COALESCING = REALTIME_MIN_CHANGE_DB > 0 or REALTIME_MAX_INTERVAL > 0
+
+# Image storage settings, resolved once for the capture worker and the retention sweep
+IMAGE_SAVE_PATH = DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path']
+IMAGE_RETENTION_SECONDS = DEVICE_AND_NOISE_MONITORING_CONFIG['image_retention_hours'] * 3600
+
+# Home Assistant discovery topics and payload, serialized once
+AVAILABILITY_TOPIC = f"homeassistant/sensor/{DEVICE_NAME}/noise_level/availability"
+SENSOR_CONFIG_TOPIC = f"homeassistant/sensor/{DEVICE_NAME}/noise_level/config"
+SENSOR_CONFIG_PAYLOAD = json_dumps({
+    "device_class": "sound_pressure",
+    "name": f"{DEVICE_NAME} Noise Level",
+    "state_topic": REALTIME_TOPIC,
+    "unit_of_measurement": "dB",
+    "value_template": "{{ value_json.noise_level }}",
+    "unique_id": f"{DEVICE_NAME}_noise_level_sensor",
+    "availability_topic": AVAILABILITY_TOPIC,
+    "device": {
+        "identifiers": [f"{DEVICE_NAME}_sensor"],
+        "name": f"{DEVICE_NAME} Noise Sensor",
+        "model": "Custom Noise Sensor",
+        "manufacturer": "Silkyclouds"
+    }
+})
+
+# Global variables to keep track of device detection status and the detected device
 device_detected = False
+detected_usb_device = None
 
 # Detect USB sound meter device based on config or known IDs
-def detect_usb_device(verbose=True):
-    global device_detected
-    devices = usb.core.find(find_all=True)
-    detected_device = None
-
-    for dev in devices:
-        dev_vendor_id = dev.idVendor  # integer
-        dev_product_id = dev.idProduct  # integer
-
-        # Check if specific USB ID is set in config
-        if usb_vendor_id_int and usb_product_id_int:
-            if dev_vendor_id == usb_vendor_id_int and dev_product_id == usb_product_id_int:
-                if verbose or not device_detected:
-                    model = next((name for vid, pid, name in usb_ids if vid == dev_vendor_id and pid == dev_product_id), None)
-                    if model:
-                        logger.info(f"Detected specified device: {model} (Vendor ID {hex(dev_vendor_id)}, Product ID {hex(dev_product_id)})")
-                    else:
-                        logger.info("User defined USB sound device detected. Please let us know about your working device so we can add it to the official list of supported devices.")
-                device_detected = True
-                return dev
-
-        # Check against known sound meters in usb_ids file
-        elif any((dev_vendor_id, dev_product_id) == (vid, pid) for vid, pid, _ in usb_ids):
+def detect_usb_device(verbose=True, force=False):
+    """Return the USB sound meter, reusing the last detected device unless force is set."""
+    global device_detected, detected_usb_device
+    if detected_usb_device is not None and not force:
+        return detected_usb_device
+
+    # Let pyusb filter by ID instead of walking every device on the bus here
+    if usb_vendor_id_int and usb_product_id_int:
+        dev = usb.core.find(idVendor=usb_vendor_id_int, idProduct=usb_product_id_int)
+        if dev is not None:
             if verbose or not device_detected:
-                model = next((name for vid, pid, name in usb_ids if vid == dev_vendor_id and pid == dev_product_id), "Unknown model")
-                logger.info(f"{model} sound meter detected: Vendor ID {hex(dev_vendor_id)}, Product ID {hex(dev_product_id)}")
+                known_model = usb_ids.get((usb_vendor_id_int, usb_product_id_int))
+                if known_model:
+                    logger.info(f"Detected specified device: {known_model} (Vendor ID {hex(usb_vendor_id_int)}, Product ID {hex(usb_product_id_int)})")
+                else:
+                    logger.info("User defined USB sound device detected. Please let us know about your working device so we can add it to the official list of supported devices.")
             device_detected = True
+            detected_usb_device = dev
+            return dev
+
+    # Check against known sound meters in usb_ids file
+    elif usb_ids:
+        dev = usb.core.find(custom_match=lambda d: (d.idVendor, d.idProduct) in usb_ids)
+        if dev is not None:
+            if verbose or not device_detected:
+                known_model = usb_ids[(dev.idVendor, dev.idProduct)]
+                logger.info(f"{known_model} sound meter detected: Vendor ID {hex(dev.idVendor)}, Product ID {hex(dev.idProduct)}")
+            device_detected = True
+            detected_usb_device = dev
             return dev
-        else:
-            if verbose and not device_detected:
-                logger.info(f"Ignoring non-sound meter device: Vendor ID {hex(dev_vendor_id)}, Product ID {hex(dev_product_id)}")
 
     # No device found
     if usb_vendor_id_int and usb_product_id_int:
@@ -371,6 +413,7 @@ def detect_usb_device(verbose=True):
         if verbose or device_detected:
             logger.error("Device not found in known USB IDs. Will attempt to autodetect the USB device from the usb_ids file.")
     device_detected = False
+    detected_usb_device = None
     return None
 
 # Main function to initialize detection and proceed with device operations
@@ -385,8 +428,77 @@ def main():
 if __name__ == "__main__":
     main()
 
-# Queue for handling failed InfluxDB writes
-failed_writes_queue = Queue()
+# Bounded queue for handling failed InfluxDB writes; the oldest entries are dropped during long outages
+failed_writes_queue = deque(maxlen=10000)
+failed_writes_lock = threading.Lock()
+dropped_failed_writes = 0
+
+def queue_failed_write(bucket, data):
+    """Add a failed write to the retry queue, dropping the oldest entry when the queue is full."""
+    global dropped_failed_writes
+    with failed_writes_lock:
+        if len(failed_writes_queue) == failed_writes_queue.maxlen:
+            dropped_failed_writes += 1
+            logger.warning(f"Failed writes queue is full; dropping the oldest entry ({dropped_failed_writes} dropped so far).")
+        failed_writes_queue.append((bucket, data))
+
+# Target buckets, validated by check_configuration() when InfluxDB is enabled
+INFLUXDB_BUCKET = INFLUXDB_CONFIG.get("bucket")
+INFLUXDB_REALTIME_BUCKET = INFLUXDB_CONFIG.get("realtime_bucket")
+
+# Measurement and tags used for noise events written to InfluxDB
+INFLUXDB_MEASUREMENT = "noise_buster_events"
+INFLUXDB_TAGS = {"location": "noise_buster"}
+
+# Divisors converting time.time_ns() to each supported InfluxDB write precision
+INFLUXDB_PRECISION_DIVISORS = {"s": 1_000_000_000, "ms": 1_000_000, "us": 1_000, "ns": 1}
+INFLUXDB_WRITE_PRECISION = INFLUXDB_CONFIG.get("write_precision", "s")
+if INFLUXDB_WRITE_PRECISION not in INFLUXDB_PRECISION_DIVISORS:
+    logger.error(f"Invalid InfluxDB 'write_precision' '{INFLUXDB_WRITE_PRECISION}'. Falling back to 's'.")
+    INFLUXDB_WRITE_PRECISION = "s"
+INFLUXDB_PRECISION_DIVISOR = INFLUXDB_PRECISION_DIVISORS[INFLUXDB_WRITE_PRECISION]
+
+# Static measurement and tag part of every noise event line, built once with tags in the
+# lexicographic key order InfluxDB stores them in
+INFLUXDB_TAG_SET = ",".join(f"{key}={value}" for key, value in sorted(INFLUXDB_TAGS.items()))
+INFLUXDB_LINE_PREFIX = f"{INFLUXDB_MEASUREMENT},{INFLUXDB_TAG_SET} "
+
+def escape_line_protocol_string(value):
+    """Escape a string field value for InfluxDB line protocol."""
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+def format_noise_line(fields, timestamp_ns):
+    """Format noise event fields as an InfluxDB line protocol string at the configured write precision."""
+    field_set = ",".join(
+        f'{key}="{escape_line_protocol_string(value)}"' if isinstance(value, str) else f"{key}={value}"
+        for key, value in fields.items()
+    )
+    return f"{INFLUXDB_LINE_PREFIX}{field_set} {timestamp_ns // INFLUXDB_PRECISION_DIVISOR}"
+
+# Last known InfluxDB reachability, updated by write outcomes and the periodic health check
+influxdb_healthy = None
+
+def record_influxdb_health(healthy):
+    """Store InfluxDB reachability and log whenever it changes."""
+    global influxdb_healthy
+    if healthy != influxdb_healthy:
+        if healthy:
+            logger.info("InfluxDB is reachable.")
+        else:
+            logger.warning("InfluxDB is not reachable. Writes will be retried.")
+    influxdb_healthy = healthy
+
+def on_influxdb_write_success(conf, data):
+    """Mark InfluxDB healthy whenever a batch is written."""
+    if influxdb_healthy is not True:
+        record_influxdb_health(True)
+
+def on_influxdb_write_error(conf, data, exception):
+    """Queue a batch the write API gave up on so it can be retried later."""
+    bucket = conf[0]
+    logger.error(f"Failed to write batch to InfluxDB bucket '{bucket}': {str(exception)}. Adding to queue.")
+    record_influxdb_health(False)
+    queue_failed_write(bucket, data)
 
 # Connect to InfluxDB if enabled
 def connect_influxdb():
@@ -397,9 +509,24 @@ def connect_influxdb():
                 url=f"{protocol}://{INFLUXDB_CONFIG['host']}:{INFLUXDB_CONFIG['port']}",
                 token=INFLUXDB_CONFIG['token'],
                 org=INFLUXDB_CONFIG['org'],
-                timeout=INFLUXDB_CONFIG.get('timeout', 20000)
+                timeout=INFLUXDB_CONFIG.get('timeout', 20000),
+                enable_gzip=True,
+                # Keep connections alive and shared between the write API and health checks
+                connection_pool_maxsize=10
             )
-            write_api = influxdb_client.write_api(write_options=SYNCHRONOUS)
+            # Points are buffered and flushed in batches by the client's background thread
+            write_api = influxdb_client.write_api(write_options=WriteOptions(
+                batch_size=500,
+                flush_interval=5000,
+                jitter_interval=1000,
+                # Failed batches are retried in the background with exponential backoff
+                retry_interval=5000,
+                max_retries=5,
+                max_retry_delay=125_000,
+                exponential_base=2,
+                # Give up on a batch after five minutes and hand it to failed_writes_queue
+                max_retry_time=300_000
+            ), success_callback=on_influxdb_write_success, error_callback=on_influxdb_write_error)
             return influxdb_client, write_api
         except Exception as e:
             logger.error(f"Failed to connect to InfluxDB: {e}")
@@ -411,16 +538,37 @@ def connect_influxdb():
 # Initialize InfluxDB client if enabled
 influxdb_client, write_api = connect_influxdb()
 
+influxdb_closed = False
+
+def close_influxdb():
+    """Flush pending batched writes and close the InfluxDB client, once."""
+    global influxdb_closed
+    if influxdb_closed:
+        return
+    influxdb_closed = True
+    if write_api:
+        write_api.close()
+    if influxdb_client:
+        influxdb_client.close()
+
+# Drain buffered batches on any interpreter exit, not only through the main block
+atexit.register(close_influxdb)
+
 # Initialize MQTT client if enabled
 mqtt_client = None
 mqtt_connected = False
 if MQTT_CONFIG.get("enabled") and mqtt:
-    mqtt_client = mqtt.Client()
+    # Readable client id that stays unique when several devices keep the default device name
+    if DEVICE_NAME == "noise_buster_device":
+        logger.warning("'device_name' is still the default 'noise_buster_device'. Set a unique name per device so MQTT topics do not collide.")
+    mqtt_client = mqtt.Client(client_id=f"{DEVICE_NAME}-{socket.gethostname()}")
     if MQTT_CONFIG.get("user") and MQTT_CONFIG.get("password"):
         mqtt_client.username_pw_set(MQTT_CONFIG["user"], MQTT_CONFIG["password"])
+    # Bound paho's outgoing buffers so a slow broker cannot grow memory without limit
+    mqtt_client.max_inflight_messages_set(20)
+    mqtt_client.max_queued_messages_set(1000)
     try:
-        availability_topic = f"homeassistant/sensor/{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}/noise_level/availability"
-        mqtt_client.will_set(availability_topic, payload="offline", qos=1, retain=True)
+        mqtt_client.will_set(AVAILABILITY_TOPIC, payload="offline", qos=1, retain=True)
         mqtt_client.connect(MQTT_CONFIG["server"], MQTT_CONFIG["port"], 60)
         mqtt_client.loop_start()
         mqtt_connected = True
@@ -429,26 +577,10 @@ if MQTT_CONFIG.get("enabled") and mqtt:
         # Publish sensor configuration
         def publish_sensor_config():
             """Publish sensor configuration to MQTT for Home Assistant integration."""
-            noise_sensor_config = {
-                "device_class": "sound_pressure",
-                "name": f"{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']} Noise Level",
-                "state_topic": f"homeassistant/sensor/{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}/realtime_noise_levels/state",
-                "unit_of_measurement": "dB",
-                "value_template": "{{ value_json.noise_level }}",
-                "unique_id": f"{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}_noise_level_sensor",
-                "availability_topic": availability_topic,
-                "device": {
-                    "identifiers": [f"{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}_sensor"],
-                    "name": f"{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']} Noise Sensor",
-                    "model": "Custom Noise Sensor",
-                    "manufacturer": "Silkyclouds"
-                }
-            }
-            config_topic = f"homeassistant/sensor/{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}/noise_level/config"
-            mqtt_client.publish(config_topic, json.dumps(noise_sensor_config), qos=1, retain=True)
-            logger.info(f"Sensor configuration published to {config_topic}")
-            mqtt_client.publish(availability_topic, "online", qos=1, retain=True)
-            logger.info(f"Sensor availability published to {availability_topic}")
+            mqtt_client.publish(SENSOR_CONFIG_TOPIC, SENSOR_CONFIG_PAYLOAD, qos=1, retain=True)
+            logger.info(f"Sensor configuration published to {SENSOR_CONFIG_TOPIC}")
+            mqtt_client.publish(AVAILABILITY_TOPIC, "online", qos=1, retain=True)
+            logger.info(f"Sensor availability published to {AVAILABILITY_TOPIC}")
 
         if mqtt_connected:
             publish_sensor_config()
@@ -460,38 +592,115 @@ else:
         logger.error("MQTT is enabled but the 'paho-mqtt' package is not installed. Feature will be disabled.")
         MQTT_CONFIG["enabled"] = False
 
+# Notifications are delivered by a background thread so callers never wait on Discord or Pushover
+notification_queue = Queue(maxsize=256)
+dropped_notifications = 0
+
+def queue_notification(service, message):
+    """Queue a notification for delivery without blocking, dropping it if the queue is full."""
+    global dropped_notifications
+    try:
+        notification_queue.put_nowait((service, message))
+    except Full:
+        dropped_notifications += 1
+        logger.warning(f"Notification queue is full; dropping {service} notification ({dropped_notifications} dropped so far).")
+
+def deliver_discord_notification(message):
+    """Post a message to the Discord webhook."""
+    try:
+        data = {"content": message}
+        response = http_session.post(DISCORD_CONFIG["webhook_url"], json=data, timeout=HTTP_TIMEOUT)
+        if response.status_code == 204:
+            logger.info("Discord notification sent successfully.")
+        else:
+            logger.error(f"Failed to send Discord notification: {response.status_code}, {response.text}")
+    except Exception as e:
+        logger.error(f"Error sending Discord notification: {str(e)}")
+        logger.debug("Exception details:", exc_info=True)
+
+# Pushover form fields that do not change between notifications
+PUSHOVER_API_URL = "https://api.pushover.net/1/messages.json"
+PUSHOVER_STATIC_FIELDS = {
+    "token": PUSHOVER_CONFIG.get("api_token"),
+    "user": PUSHOVER_CONFIG.get("user_key"),
+    "title": PUSHOVER_CONFIG.get("title", "Noise Buster")
+}
+
+def deliver_pushover_notification(message):
+    """Post a message to the Pushover API."""
+    try:
+        response = http_session.post(PUSHOVER_API_URL, data={**PUSHOVER_STATIC_FIELDS, "message": message}, timeout=HTTP_TIMEOUT)
+        if response.status_code == 200:
+            logger.info(f"Pushover notification sent: {message}")
+        else:
+            logger.error(f"Failed to send Pushover notification: {response.status_code}, {response.text}")
+    except Exception as e:
+        logger.error(f"Error sending Pushover notification: {str(e)}")
+        logger.debug("Exception details:", exc_info=True)
+
+def run_notification_worker():
+    """Deliver queued notifications one at a time."""
+    deliver = {
+        "discord": deliver_discord_notification,
+        "pushover": deliver_pushover_notification,
+    }
+    while True:
+        service, message = notification_queue.get()
+        try:
+            deliver[service](message)
+        finally:
+            notification_queue.task_done()
+
+notification_thread = threading.Thread(target=run_notification_worker)
+notification_thread.daemon = True
+notification_thread.start()
+
+def flush_notifications(timeout=10):
+    """Wait up to timeout seconds for queued notifications to be delivered."""
+    deadline = time.monotonic() + timeout
+    while notification_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.1)
+
 # Send Discord notification if enabled
 def send_discord_notification(message):
     if DISCORD_CONFIG.get("enabled"):
         if DISCORD_CONFIG.get("webhook_url") and not DISCORD_CONFIG.get("webhook_url").startswith("<YOUR_"):
-            try:
-                data = {"content": message}
-                response = requests.post(DISCORD_CONFIG["webhook_url"], json=data)
-                if response.status_code == 204:
-                    logger.info("Discord notification sent successfully.")
-                else:
-                    logger.error(f"Failed to send Discord notification: {response.status_code}, {response.text}")
-            except Exception as e:
-                logger.error(f"Error sending Discord notification: {str(e)}")
-                logger.debug("Exception details:", exc_info=True)
+            queue_notification("discord", message)
         else:
             logger.error("Discord webhook URL is missing or invalid in the configuration. Feature will be disabled.")
             DISCORD_CONFIG["enabled"] = False
 
 # Notify on start
-def notify_on_start():
-    hostname = socket.gethostname()
-    local_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def ping_influxdb():
+    """Ping InfluxDB once and record whether it answered."""
     try:
-        dev = detect_usb_device(verbose=False)
-        usb_status = "USB sound meter detected" if dev else "USB sound meter not detected"
+        record_influxdb_health(influxdb_client.ping())
     except Exception as e:
-        usb_status = f"Error detecting USB sound meter: {str(e)}"
-        logger.debug("Exception details:", exc_info=True)
+        logger.debug(f"InfluxDB ping failed: {str(e)}")
+        record_influxdb_health(False)
+
+def get_influxdb_status(timeout=1.0):
+    """Return the InfluxDB connection status, pinging in the background only if it is not cached yet."""
+    if not influxdb_client:
+        return "Not connected"
+    if influxdb_healthy is None:
+        # A slow or unreachable server must not hold up startup for the full client timeout;
+        # a late answer still updates the health state once the ping returns
+        ping_thread = threading.Thread(target=ping_influxdb, name="influxdb-ping", daemon=True)
+        ping_thread.start()
+        ping_thread.join(timeout)
+        if influxdb_healthy is None:
+            return "Unknown"
+    return "Connected" if influxdb_healthy else "Not connected"
+
+def notify_on_start(dev):
+    hostname = socket.gethostname()
+    local_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    usb_status = "USB sound meter detected" if dev else "USB sound meter not detected"
 
     influxdb_url = f"https://{INFLUXDB_CONFIG['host']}:{INFLUXDB_CONFIG['port']}" if INFLUXDB_CONFIG.get("enabled") else "N/A"
     mqtt_status = "Connected" if mqtt_connected else "Not connected"
-    influxdb_status = "Connected" if influxdb_client else "Not connected"
+    influxdb_status = get_influxdb_status()
     weather_status = "Enabled" if WEATHER_CONFIG.get("enabled") else "Disabled"
 
     message = (
@@ -502,7 +711,7 @@ def notify_on_start():
         f"InfluxDB Connection: **{influxdb_status}**\n"
         f"MQTT Connection: **{mqtt_status}**\n"
         f"USB Sound Meter: **{usb_status}**\n"
-        f"Minimum Noise Level: **{DEVICE_AND_NOISE_MONITORING_CONFIG['minimum_noise_level']} dB**\n"
+        f"Minimum Noise Level: **{MINIMUM_NOISE_LEVEL} dB**\n"
         f"Camera Usage: **{'IP Camera' if CAMERA_CONFIG.get('use_ip_camera') else 'None'}**\n"
         f"Telraam Usage: **{'Enabled' if TELRAAM_API_CONFIG.get('enabled') else 'Disabled'}**\n"
         f"Weather Data Collection: **{weather_status}**\n"
@@ -516,40 +725,148 @@ def send_pushover_notification(message):
     """Send notification via Pushover."""
     if PUSHOVER_CONFIG.get("enabled"):
         if PUSHOVER_CONFIG.get("user_key") and PUSHOVER_CONFIG.get("api_token"):
-            try:
-                conn = http.client.HTTPSConnection("api.pushover.net:443")
-                conn.request("POST", "/1/messages.json",
-                             urllib.parse.urlencode({
-                                 "token": PUSHOVER_CONFIG["api_token"],
-                                 "user": PUSHOVER_CONFIG["user_key"],
-                                 "message": message,
-                                 "title": PUSHOVER_CONFIG.get("title", "Noise Buster")
-                             }), {"Content-type": "application/x-www-form-urlencoded"})
-                conn.getresponse()
-                logger.info(f"Pushover notification sent: {message}")
-            except Exception as e:
-                logger.error(f"Error sending Pushover notification: {str(e)}")
-                logger.debug("Exception details:", exc_info=True)
+            queue_notification("pushover", message)
         else:
             logger.error("Pushover 'user_key' or 'api_token' is missing or invalid in the configuration. Feature will be disabled.")
             PUSHOVER_CONFIG["enabled"] = False
 
+# Number of MQTT messages published since the last summary was logged
+mqtt_publish_count = 0
+# Guards mqtt_publish_count, which the publisher thread increments and the hourly summary resets
+mqtt_publish_count_lock = threading.Lock()
+
+# Publishes are handed to a background thread so a slow broker socket never stalls sampling
+MQTT_PUBLISH_QUEUE_SIZE = 4096
+mqtt_publish_queue = deque()
+mqtt_publish_condition = threading.Condition()
+dropped_mqtt_messages = 0
+
+def run_mqtt_publisher():
+    """Publish queued MQTT messages one at a time."""
+    global mqtt_publish_count
+    while True:
+        with mqtt_publish_condition:
+            while not mqtt_publish_queue:
+                mqtt_publish_condition.wait()
+            topic, payload = mqtt_publish_queue.popleft()
+        try:
+            # Readings are superseded by the next window, so fire-and-forget is enough
+            mqtt_client.publish(topic, payload, qos=0, retain=False)
+            with mqtt_publish_count_lock:
+                mqtt_publish_count += 1
+        except Exception as e:
+            logger.error("Failed to publish to MQTT topic %s: %s", topic, e)
+            logger.debug("Exception details:", exc_info=True)
+
+if mqtt_client and MQTT_CONFIG.get("enabled"):
+    mqtt_publisher_thread = threading.Thread(target=run_mqtt_publisher)
+    mqtt_publisher_thread.daemon = True
+    mqtt_publisher_thread.start()
+
 # Send data to MQTT if enabled
 def send_to_mqtt(topic, payload):
-    """Publish data to MQTT topic."""
+    """Queue data for publishing to an MQTT topic, shedding the oldest realtime reading first if full."""
+    global dropped_mqtt_messages
     if mqtt_client and MQTT_CONFIG.get("enabled"):
-        mqtt_client.publish(topic, payload)
-        logger.info(f"Data published to MQTT: {topic} -> {payload}")
+        with mqtt_publish_condition:
+            if len(mqtt_publish_queue) >= MQTT_PUBLISH_QUEUE_SIZE:
+                # Threshold events are kept over realtime readings; an event is only dropped when nothing else is queued
+                for index, (queued_topic, _) in enumerate(mqtt_publish_queue):
+                    if queued_topic != EVENT_TOPIC:
+                        del mqtt_publish_queue[index]
+                        break
+                else:
+                    mqtt_publish_queue.popleft()
+                dropped_mqtt_messages += 1
+                if dropped_mqtt_messages % 100 == 1:
+                    logger.warning("MQTT publish queue is full; dropping the oldest message (%d dropped so far).", dropped_mqtt_messages)
+            mqtt_publish_queue.append((topic, payload))
+            mqtt_publish_condition.notify()
+
+def log_mqtt_summary():
+    """Log how many MQTT messages were published since the previous summary."""
+    global mqtt_publish_count
+    with mqtt_publish_count_lock:
+        published, mqtt_publish_count = mqtt_publish_count, 0
+    logger.info(f"Published {published} MQTT messages in the last hour.")
+
+# The IP camera capture thread decodes a frame only when capture_image() asks for one
+camera_frame_requested = threading.Event()
+camera_frame_ready = threading.Event()
+requested_camera_frame = None
+
+# Single worker that annotates and saves images away from the sampling thread
+image_executor = ThreadPoolExecutor(max_workers=1)
+# Set while a capture is queued or running so a slow camera cannot build up a backlog of captures
+image_capture_pending = threading.Event()
+
+def run_ip_camera_capture():
+    """Keep the IP camera stream open, grabbing frames so the most recent one can be retrieved."""
+    global requested_camera_frame
+    while True:
+        cap = cv2.VideoCapture(CAMERA_CONFIG["ip_camera_url"], cv2.CAP_FFMPEG)
+        if not cap.isOpened():
+            logger.error("Unable to open the IP camera stream. Retrying in 10 seconds.")
+            cap.release()
+            time.sleep(10)
+            continue
+
+        # Keep only the newest frame buffered so a retrieve never returns a stale one
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        logger.info("IP camera stream opened.")
+        while True:
+            # grab() only advances the stream; a frame is converted only when an image is saved
+            if not cap.grab():
+                logger.warning("Lost the IP camera stream. Reconnecting.")
+                break
+            if camera_frame_requested.is_set():
+                camera_frame_requested.clear()
+                ret, frame = cap.retrieve()
+                requested_camera_frame = frame if ret else None
+                camera_frame_ready.set()
+        cap.release()
+        time.sleep(1)
+
+def start_ip_camera_capture():
+    """Start the background IP camera capture thread if an IP camera is configured."""
+    if CAMERA_CONFIG.get("use_ip_camera") and cv2:
+        camera_thread = threading.Thread(target=run_ip_camera_capture)
+        camera_thread.daemon = True
+        camera_thread.start()
+
+# JPEG quality for saved images; OpenCV's default of 95 roughly doubles the file size
+JPEG_QUALITY = 85
+
+# Static overlay labels are rasterized once into a mask; only their values are drawn per image
+OVERLAY_LABELS = ["Time:", "Noise:", "Temp:", "Weather:", "Precipitation:"]
+overlay_label_mask = None
+overlay_value_x = 0
+
+def build_overlay_label_mask():
+    """Rasterize the overlay labels and return the mask and the x position where values start."""
+    label_width = max(cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0][0] for label in OVERLAY_LABELS)
+    value_x = 10 + label_width + 10
+    mask = np.zeros((50 + 30 * len(OVERLAY_LABELS), value_x), dtype=np.uint8)
+    y_position = 50
+    for label in OVERLAY_LABELS:
+        cv2.putText(mask, label, (10, y_position), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 255, 2)
+        y_position += 30
+    return mask.astype(bool), value_x
 
 # Capture image using camera
 def capture_image(current_peak_dB, peak_temperature, peak_weather_description, peak_precipitation, timestamp):
+    global overlay_label_mask, overlay_value_x
     if CAMERA_CONFIG.get("use_ip_camera"):
         if cv2 is None:
             logger.error("OpenCV library is not installed. Please install 'opencv-python' package.")
             return
-        cap = cv2.VideoCapture(CAMERA_CONFIG["ip_camera_url"])
-        ret, frame = cap.read()
-        cap.release()
+        # Captures run one at a time on image_executor, so a single request slot is enough
+        camera_frame_ready.clear()
+        camera_frame_requested.set()
+        frame = requested_camera_frame if camera_frame_ready.wait(timeout=5) else None
+        if frame is None:
+            logger.warning("No frame received from the IP camera; skipping image capture.")
+            return
     else:
         logger.info("No camera configured or available for capturing images.")
         return
@@ -558,42 +875,46 @@ def capture_image(current_peak_dB, peak_temperature, peak_weather_description, p
         formatted_time = timestamp.strftime("%Y-%m-%d_%H:%M:%S")
         weather_info = f"{peak_weather_description.replace(' ', '_')}_{peak_temperature}C"
         filename = f"{formatted_time}_{weather_info}.jpg"
-        filepath = os.path.join(DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path'], filename)
-
-        # Ensure the image save path exists
-        if not os.path.exists(DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path']):
-            os.makedirs(DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path'])
-            logger.info(f"Image directory created: {DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path']}")
-
-        text_lines = [
-            f"Time: {formatted_time}",
-            f"Noise: {current_peak_dB} dB",
-            f"Temp: {peak_temperature} C",
-            f"Weather: {peak_weather_description}",
-            f"Precipitation: {peak_precipitation} mm"
+        filepath = os.path.join(IMAGE_SAVE_PATH, filename)
+
+        if overlay_label_mask is None:
+            overlay_label_mask, overlay_value_x = build_overlay_label_mask()
+        mask_height = min(overlay_label_mask.shape[0], frame.shape[0])
+        mask_width = min(overlay_label_mask.shape[1], frame.shape[1])
+        frame[:mask_height, :mask_width][overlay_label_mask[:mask_height, :mask_width]] = (0, 0, 255)
+
+        values = [
+            formatted_time,
+            f"{current_peak_dB} dB",
+            f"{peak_temperature} C",
+            peak_weather_description,
+            f"{peak_precipitation} mm"
         ]
         y_position = 50
-        for line in text_lines:
-            cv2.putText(frame, line, (10, y_position), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        for value in values:
+            cv2.putText(frame, value, (overlay_value_x, y_position), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
             y_position += 30
-        cv2.imwrite(filepath, frame)
+        # Encode in memory at a fixed quality and write the file in one call
+        encoded, image_buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
+        if not encoded:
+            logger.error(f"Failed to encode image: {filepath}")
+            return
+        with open(filepath, 'wb') as image_file:
+            image_file.write(image_buffer)
         logger.info(f"Image saved: {filepath}")
 
 def delete_old_images():
     """Delete images older than retention period from the local storage."""
-    image_path = DEVICE_AND_NOISE_MONITORING_CONFIG['image_save_path']
-    if not os.path.exists(image_path):
-        os.makedirs(image_path)
-        logger.info(f"Image directory created: {image_path}")
-    current_time = datetime.now()
-    for filename in os.listdir(image_path):
-        filepath = os.path.join(image_path, filename)
-        if os.path.isfile(filepath):
-            file_creation_time = datetime.fromtimestamp(os.path.getctime(filepath))
-            time_difference = current_time - file_creation_time
-            if time_difference > timedelta(hours=DEVICE_AND_NOISE_MONITORING_CONFIG['image_retention_hours']):
-                os.remove(filepath)
-                logger.info(f"Deleted old image: {filepath}")
+    current_time = time.time()
+    # scandir entries carry cached file type and stat results, saving syscalls per file
+    with os.scandir(IMAGE_SAVE_PATH) as entries:
+        for entry in entries:
+            if entry.is_file() and current_time - entry.stat().st_ctime > IMAGE_RETENTION_SECONDS:
+                os.remove(entry.path)
+                logger.info(f"Deleted old image: {entry.path}")
+
+# Latest weather data (temperature, description, precipitation), refreshed by the scheduler
+latest_weather = (None, "", 0.0)
 
 # Fetch current weather data
 def get_weather():
@@ -602,9 +923,9 @@ def get_weather():
         return None, None, 0.0
 
     try:
-        response = requests.get(f"{WEATHER_CONFIG['api_url']}?q={WEATHER_CONFIG['location']}&appid={WEATHER_CONFIG['api_key']}&units=metric")
+        response = http_session.get(f"{WEATHER_CONFIG['api_url']}?q={WEATHER_CONFIG['location']}&appid={WEATHER_CONFIG['api_key']}&units=metric", timeout=HTTP_TIMEOUT)
         response.raise_for_status()
-        weather_data = response.json()
+        weather_data = json_loads(response.content)
         temperature = float(weather_data['main']['temp'])
         weather_description = weather_data['weather'][0]['description']
         precipitation_float = 0.0
@@ -615,21 +936,51 @@ def get_weather():
             precipitation_float += float(weather_data['snow']['1h'])
 
         return temperature, weather_description, precipitation_float
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         logger.error(f"Failed to get weather data: {str(e)}")
         logger.debug("Exception details:", exc_info=True)
         return None, None, 0.0
 
+# Interval between two sound meter readings, in seconds
+SAMPLE_INTERVAL = DEVICE_AND_NOISE_MONITORING_CONFIG.get("sample_interval", 0.1)
+if isinstance(SAMPLE_INTERVAL, bool) or not isinstance(SAMPLE_INTERVAL, (int, float)) or SAMPLE_INTERVAL <= 0:
+    logger.error(f"Invalid 'sample_interval' '{SAMPLE_INTERVAL}'. It must be a positive number of seconds. Falling back to 0.1.")
+    SAMPLE_INTERVAL = 0.1
+
+# Maximum time a single USB control transfer may block the sampling thread, in milliseconds
+USB_READ_TIMEOUT_MS = 500
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted sequence."""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+# Set to stop the main loop and the sampling thread; waiting on it lets a shutdown interrupt their sleeps
+shutdown_event = threading.Event()
+
 # Update noise level function
 def update_noise_level():
     """Monitor noise levels, record events, and perform actions based on configured thresholds."""
-    window_start_time = time.time()
+    # Window boundaries use the monotonic clock so NTP steps cannot stretch or skip a window
+    window_duration_ns = int(TIME_WINDOW_DURATION * 1_000_000_000)
+    next_window_ns = time.monotonic_ns() + window_duration_ns
     current_peak_dB = 0
+    # Running sum and count of the window's readings, used for the average level
+    window_dB_sum = 0.0
+    window_sample_count = 0
+    # Running sum of sound energy (10^(dB/10)), used for the equivalent continuous level (Leq)
+    window_energy_sum = 0.0
+    # Preallocated ring of the window's readings, used for percentile statistics
+    window_capacity = int(TIME_WINDOW_DURATION / SAMPLE_INTERVAL) + 8
+    window_samples = array('d', bytes(8 * window_capacity))
     peak_temperature = None
     peak_weather_description = ""
     peak_precipitation_float = 0.0
+    # Last realtime reading sent over MQTT, used to coalesce near-identical updates
+    last_realtime_dB = -1.0
+    last_realtime_ns = 0
 
-    global dev
+    # The device handle is local to the sampling thread; it is only replaced on USB errors
     dev = detect_usb_device(verbose=False)
     if dev is None:
         logger.error("USB sound meter device not found")
@@ -637,84 +988,107 @@ def update_noise_level():
     else:
         logger.info("USB sound meter device connected")
 
-    while True:
-        current_time = time.time()
-        if current_time - window_start_time >= DEVICE_AND_NOISE_MONITORING_CONFIG['time_window_duration']:
-            timestamp = datetime.utcnow()
-            delete_old_images()
-            logger.info(f"Time window elapsed. Current peak dB: {round(current_peak_dB, 1)}")
+    # Features are finalized before the sampling thread starts, so resolve them once
+    influxdb_enabled = bool(INFLUXDB_CONFIG.get("enabled") and influxdb_client and write_api)
+    mqtt_enabled = bool(mqtt_client and MQTT_CONFIG.get("enabled"))
+    weather_enabled = bool(WEATHER_CONFIG.get("enabled"))
+
+    # Receive buffer reused for every reading instead of allocating one per transfer
+    usb_buffer = array('B', bytes(200))
+    # Bound transfer method, looked up once per device instead of once per sample
+    read_meter = dev.ctrl_transfer
+
+    next_sample_time = time.monotonic()
+    while not shutdown_event.is_set():
+        current_ns = time.monotonic_ns()
+        if current_ns >= next_window_ns:
+            # Read the clock once per window; a datetime is only built when an image is captured
+            timestamp_ns = time.time_ns()
 
             # Publish real-time noise level
-            realtime_data = [{
-                "measurement": "noise_buster_events",
-                "tags": {"location": "noise_buster"},
-                "time": timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "fields": {"noise_level": round(current_peak_dB, 1)}
-            }]
+            realtime_fields = {"noise_level": round(current_peak_dB, 1)}
+            if window_sample_count:
+                realtime_fields["noise_level_avg"] = round(window_dB_sum / window_sample_count, 1)
+                window_sorted = sorted(window_samples[:min(window_sample_count, window_capacity)])
+                realtime_fields["noise_level_p95"] = percentile(window_sorted, 0.95)
+                realtime_fields["noise_level_leq"] = round(10 * math.log10(window_energy_sum / window_sample_count), 1)
+                # Statistical levels: LN is the level exceeded N% of the window
+                realtime_fields["noise_level_l10"] = percentile(window_sorted, 0.90)
+                realtime_fields["noise_level_l50"] = percentile(window_sorted, 0.50)
+                realtime_fields["noise_level_l90"] = percentile(window_sorted, 0.10)
+            realtime_line = format_noise_line(realtime_fields, timestamp_ns)
 
             # Log the current peak dB regardless of InfluxDB or MQTT
-            logger.info(f"Current noise level: {round(current_peak_dB, 1)} dB")
+            logger.info("Current noise level: %.1f dB", current_peak_dB)
 
             # Send data to InfluxDB if enabled
-            if INFLUXDB_CONFIG.get("enabled") and influxdb_client and write_api:
+            # Failed batches reach failed_writes_queue through the write API's error callback
+            if influxdb_enabled:
                 try:
-                    write_api.write(bucket=INFLUXDB_CONFIG['realtime_bucket'], record=realtime_data)
-                    logger.info(f"All noise levels written to realtime bucket: {round(current_peak_dB, 1)} dB")
+                    write_api.write(bucket=INFLUXDB_REALTIME_BUCKET, record=realtime_line, write_precision=INFLUXDB_WRITE_PRECISION)
+                    logger.debug("All noise levels written to realtime bucket: %.1f dB", current_peak_dB)
                 except Exception as e:
-                    logger.error(f"Failed to write to InfluxDB: {str(e)}. Adding to queue.")
-                    logger.debug("Exception details:", exc_info=True)
-                    failed_writes_queue.put((INFLUXDB_CONFIG['realtime_bucket'], [realtime_data]))
+                    logger.error("Failed to write to InfluxDB realtime bucket: %s. Adding to queue.", e)
+                    record_influxdb_health(False)
+                    queue_failed_write(INFLUXDB_REALTIME_BUCKET, realtime_line)
             else:
                 logger.debug("InfluxDB is disabled or not properly configured; skipping write.")
 
-            # Publish to MQTT if enabled
-            if mqtt_client and MQTT_CONFIG.get("enabled"):
-                realtime_topic = f"homeassistant/sensor/{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}/realtime_noise_levels/state"
-                realtime_payload = json.dumps(realtime_data[0]['fields'])
-                send_to_mqtt(realtime_topic, realtime_payload)
-                logger.info(f"Data published to MQTT: {realtime_topic} -> {realtime_payload}")
-
-            if current_peak_dB >= DEVICE_AND_NOISE_MONITORING_CONFIG['minimum_noise_level']:
-                peak_temperature_float = float(peak_temperature) if peak_temperature is not None else 0.0
-                peak_weather_description_adjusted = peak_weather_description if peak_weather_description is not None else ""
-                main_data = {
-                    "measurement": "noise_buster_events",
-                    "tags": {"location": "noise_buster"},
-                    "time": timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "fields": {
-                        "noise_level": round(current_peak_dB, 1),
-                        "temperature": peak_temperature_float,
-                        "weather_description": peak_weather_description_adjusted,
-                        "precipitation": peak_precipitation_float
-                    }
+            # Publish to MQTT if enabled, skipping readings too close to the last published one
+            if mqtt_enabled:
+                realtime_dB = realtime_fields["noise_level"]
+                if (not REALTIME_COALESCING
+                        or (REALTIME_MIN_CHANGE_DB > 0 and abs(realtime_dB - last_realtime_dB) >= REALTIME_MIN_CHANGE_DB)
+                        or (REALTIME_MAX_INTERVAL > 0 and current_ns - last_realtime_ns >= REALTIME_MAX_INTERVAL_NS)):
+                    send_to_mqtt(REALTIME_TOPIC, json_dumps(realtime_fields))
+                    last_realtime_dB = realtime_dB
+                    last_realtime_ns = current_ns
+
+            if current_peak_dB >= MINIMUM_NOISE_LEVEL:
+                # Weather values are already floats and a string; only a missing temperature needs a default
+                peak_temperature_float = peak_temperature if peak_temperature is not None else 0.0
+                main_fields = {
+                    "noise_level": round(current_peak_dB, 1),
+                    "temperature": peak_temperature_float,
+                    "weather_description": peak_weather_description,
+                    "precipitation": peak_precipitation_float
                 }
+                main_line = format_noise_line(main_fields, timestamp_ns)
 
                 # Log the event of noise level exceeding the threshold
-                logger.info(f"Noise level exceeded threshold: {round(current_peak_dB, 1)} dB")
+                logger.info("Noise level exceeded threshold: %.1f dB", current_peak_dB)
 
-                # Send data to InfluxDB if enabled
-                if INFLUXDB_CONFIG.get("enabled") and influxdb_client and write_api:
+                # Send data to InfluxDB if enabled; failed batches are queued by the error callback
+                if influxdb_enabled:
                     try:
-                        write_api.write(bucket=INFLUXDB_CONFIG['bucket'], record=main_data)
-                        logger.info(f"High noise level data written to main bucket: {main_data}")
+                        write_api.write(bucket=INFLUXDB_BUCKET, record=main_line, write_precision=INFLUXDB_WRITE_PRECISION)
+                        logger.debug("High noise level data written to main bucket: %s", main_line)
                     except Exception as e:
-                        logger.error(f"Failed to write to InfluxDB: {str(e)}. Adding to queue.")
-                        logger.debug("Exception details:", exc_info=True)
-                        failed_writes_queue.put((INFLUXDB_CONFIG['bucket'], [main_data]))
+                        logger.error("Failed to write to InfluxDB main bucket: %s. Adding to queue.", e)
+                        record_influxdb_health(False)
+                        queue_failed_write(INFLUXDB_BUCKET, main_line)
                 else:
                     logger.debug("InfluxDB is disabled or not properly configured; skipping write.")
 
                 # Publish to MQTT if enabled
-                if mqtt_client and MQTT_CONFIG.get("enabled"):
-                    event_topic = f"homeassistant/sensor/{DEVICE_AND_NOISE_MONITORING_CONFIG['device_name']}/noise_levels/state"
-                    event_payload = json.dumps(main_data['fields'])
-                    send_to_mqtt(event_topic, event_payload)
-                    logger.info(f"Data published to MQTT: {event_topic} -> {event_payload}")
+                if mqtt_enabled:
+                    send_to_mqtt(EVENT_TOPIC, json_dumps(main_fields))
 
-                capture_image(current_peak_dB, peak_temperature_float, peak_weather_description_adjusted, peak_precipitation_float, timestamp)
+                timestamp = datetime.utcfromtimestamp(timestamp_ns // 1_000_000_000)
+                if image_capture_pending.is_set():
+                    logger.warning("Skipping image capture: the previous capture is still in progress.")
+                else:
+                    image_capture_pending.set()
+                    image_executor.submit(capture_image, current_peak_dB, peak_temperature_float, peak_weather_description, peak_precipitation_float, timestamp).add_done_callback(lambda future: image_capture_pending.clear())
 
-            window_start_time = current_time
+            next_window_ns += window_duration_ns
+            if next_window_ns <= current_ns:
+                # Fell more than a window behind (e.g. a USB stall): start afresh rather than emit empty windows
+                next_window_ns = current_ns + window_duration_ns
             current_peak_dB = 0
+            window_dB_sum = 0.0
+            window_sample_count = 0
+            window_energy_sum = 0.0
             peak_temperature = None
             peak_weather_description = ""
             peak_precipitation_float = 0.0
@@ -722,55 +1096,116 @@ def update_noise_level():
         # Read current noise level from the device
         try:
             if dev:
-                ret = dev.ctrl_transfer(0xC0, 4, 0, 0, 200)
-                dB = (ret[0] + ((ret[1] & 3) * 256)) * 0.1 + 30
-                dB = round(dB, 1)  # Round to one decimal place
-                if dB > current_peak_dB:
-                    current_peak_dB = dB
-                    if WEATHER_CONFIG.get("enabled"):
-                        peak_temperature, peak_weather_description, precipitation = get_weather()
-                        peak_precipitation_float = float(precipitation)
+                bytes_read = read_meter(0xC0, 4, 0, 0, usb_buffer, USB_READ_TIMEOUT_MS)
+                if bytes_read < 2:
+                    # A short transfer would leave stale bytes from the previous reading in the buffer
+                    logger.warning("Short read from sound meter (%d bytes); skipping sample.", bytes_read)
+                else:
+                    dB = (usb_buffer[0] | ((usb_buffer[1] & 3) << 8)) * 0.1 + 30
+                    dB = round(dB, 1)  # Round to one decimal place
+                    window_samples[window_sample_count % window_capacity] = dB
+                    window_dB_sum += dB
+                    window_energy_sum += 10.0 ** (dB * 0.1)
+                    window_sample_count += 1
+                    if dB > current_peak_dB:
+                        current_peak_dB = dB
+                        if weather_enabled:
+                            # Use the cached weather; fetching here would stall sampling on HTTP
+                            peak_temperature, peak_weather_description, peak_precipitation_float = latest_weather
             else:
                 logger.error("USB device not available")
         except usb.core.USBError as usb_err:
-            logger.error(f"USB Error reading from device: {str(usb_err)}")
+            logger.error("USB Error reading from device: %s", usb_err)
             logger.debug("Exception details:", exc_info=True)
-            dev = detect_usb_device(verbose=False)
+            dev = detect_usb_device(verbose=False, force=True)
             if dev is None:
                 logger.error("Device not found on re-scan")
             else:
+                read_meter = dev.ctrl_transfer
                 logger.info("Reconnected to USB device")
         except Exception as e:
-            logger.error(f"Unexpected error reading from device: {str(e)}")
+            logger.error("Unexpected error reading from device: %s", e)
             logger.debug("Exception details:", exc_info=True)
 
-        time.sleep(0.1)
+        # Sleep until the next sample is due so the sampling cadence does not drift;
+        # waiting on the shutdown event lets a shutdown end the loop right away
+        next_sample_time += SAMPLE_INTERVAL
+        delay = next_sample_time - time.monotonic()
+        if delay > 0:
+            shutdown_event.wait(delay)
+        else:
+            # Running late (e.g. after a slow iteration): resynchronize instead of bursting
+            next_sample_time = time.monotonic()
+
+# Scheduled jobs run on a small pool so a slow API call cannot hold up the other jobs
+scheduled_job_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="scheduled")
+scheduled_jobs_in_flight = set()
+scheduled_jobs_lock = threading.Lock()
+
+def finish_scheduled_job(job, future):
+    """Clear a finished job's in-flight mark and log any exception it raised."""
+    with scheduled_jobs_lock:
+        scheduled_jobs_in_flight.discard(job)
+    # Jobs cancelled at shutdown never ran, and exception() would raise CancelledError for them
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Scheduled job {job.__name__} failed: {str(error)}")
+
+def run_in_background(job):
+    """Wrap a job so the scheduler submits it to the pool, skipping runs while the previous one is busy."""
+    @functools.wraps(job)
+    def submit_job():
+        with scheduled_jobs_lock:
+            if job in scheduled_jobs_in_flight:
+                logger.warning(f"Skipping {job.__name__}: the previous run is still in progress.")
+                return
+            scheduled_jobs_in_flight.add(job)
+        scheduled_job_executor.submit(job).add_done_callback(lambda future: finish_scheduled_job(job, future))
+    return submit_job
 
 def schedule_tasks():
     try:
         if TELRAAM_API_CONFIG.get("enabled"):
             interval = TELRAAM_API_CONFIG["request_interval_minutes"]
-            schedule.every(interval).minutes.do(update_traffic_data)
+            schedule.every(interval).minutes.do(run_in_background(update_traffic_data))
             logger.info(f"Telraam API Call Tasks have been scheduled successfully to run every {interval} minutes.")
 
         # Schedule weather data update every 5 minutes
         if WEATHER_CONFIG.get("enabled"):
-            schedule.every(5).minutes.do(update_weather_data)
+            schedule.every(5).minutes.do(run_in_background(update_weather_data))
             logger.info("Weather data update task has been scheduled to run every 5 minutes.")
+            # Fill the weather cache right away instead of waiting for the first run
+            update_weather_data()
 
-        # Schedule retry of failed writes every minute if InfluxDB is enabled
+        # Summarize MQTT publishing hourly instead of logging every message
+        if MQTT_CONFIG.get("enabled"):
+            schedule.every(1).hours.do(run_in_background(log_mqtt_summary))
+
+        # Sweep for images past their retention period a few times per retention period, at most hourly
+        cleanup_interval_hours = max(1, int(IMAGE_RETENTION_SECONDS // 3600) // 4)
+        schedule.every(cleanup_interval_hours).hours.do(run_in_background(delete_old_images))
+        # Sweep once at startup in the background so a long interval does not delay the first cleanup
+        run_in_background(delete_old_images)()
+
+        # Schedule retry of failed writes every minute and health checks every 30 seconds if InfluxDB is enabled
         if INFLUXDB_CONFIG.get("enabled"):
-            schedule.every(1).minute.do(retry_failed_writes)
+            schedule.every(1).minute.do(run_in_background(retry_failed_writes))
+            schedule.every(30).seconds.do(run_in_background(check_influxdb_health))
     except Exception as e:
         logger.error("Error scheduling tasks: " + str(e))
         logger.debug("Exception details:", exc_info=True)
 
 def update_weather_data():
     """Function to periodically update weather data."""
+    global latest_weather
     # Fetch and update weather data
     try:
         temperature, weather_description, precipitation = get_weather()
         if temperature is not None:
+            # Single tuple assignment, so the sampling thread always sees a consistent set
+            latest_weather = (temperature, weather_description, precipitation)
             logger.info(f"Weather data updated: Temp={temperature}C, Description={weather_description}, Precipitation={precipitation}mm")
         else:
             logger.warning("Weather data update failed.")
@@ -778,6 +1213,11 @@ def update_weather_data():
         logger.error(f"Error updating weather data: {str(e)}")
         logger.debug("Exception details:", exc_info=True)
 
+# urllib3 does not retry POST by default; the Telraam traffic query is read-only, so its gateway errors can be retried too
+if TELRAAM_API_CONFIG.get("enabled") and TELRAAM_API_CONFIG.get("api_url"):
+    http_session.mount(TELRAAM_API_CONFIG["api_url"], HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=Retry(
+        total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=frozenset({"POST"}), raise_on_status=False)))
+
 def update_traffic_data():
     """Function to periodically update traffic data from Telraam API."""
     if not TELRAAM_API_CONFIG.get("enabled"):
@@ -791,13 +1231,12 @@ def update_traffic_data():
             "format": "per-hour",
             "id": TELRAAM_API_CONFIG['segment_id']
         }
-        response = requests.post(TELRAAM_API_CONFIG['api_url'], headers=headers, json=payload)
+        response = http_session.post(TELRAAM_API_CONFIG['api_url'], headers=headers, json=payload, timeout=TELRAAM_HTTP_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
 
         if 'features' in data and data['features']:
             traffic_counts = data['features'][0]['properties']['trafficData']
-            timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
 
             # Prepare data for InfluxDB
             influx_data = []
@@ -815,15 +1254,10 @@ def update_traffic_data():
                 }
                 influx_data.append(record)
 
-            # Write data to InfluxDB
+            # Write data to InfluxDB; failed batches are queued by the error callback
             if INFLUXDB_CONFIG.get("enabled") and influxdb_client and write_api:
-                try:
-                    write_api.write(bucket=INFLUXDB_CONFIG['bucket'], record=influx_data)
-                    logger.info("Telraam traffic data written to InfluxDB.")
-                except Exception as e:
-                    logger.error(f"Failed to write Telraam data to InfluxDB: {str(e)}. Adding to queue.")
-                    logger.debug("Exception details:", exc_info=True)
-                    failed_writes_queue.put((INFLUXDB_CONFIG['bucket'], influx_data))
+                write_api.write(bucket=INFLUXDB_BUCKET, record=influx_data, write_precision=INFLUXDB_WRITE_PRECISION)
+                logger.info("Telraam traffic data written to InfluxDB.")
             else:
                 logger.debug("InfluxDB is disabled or not properly configured; skipping write.")
 
@@ -833,25 +1267,63 @@ def update_traffic_data():
         logger.error(f"Error updating traffic data from Telraam: {str(e)}")
         logger.debug("Exception details:", exc_info=True)
 
+# Consecutive retry rounds run while InfluxDB was unhealthy, and the earliest time of the next round
+retry_failure_streak = 0
+next_retry_time = 0.0
+
 def retry_failed_writes():
     """Retry any failed writes to InfluxDB."""
+    global retry_failure_streak, next_retry_time
     if not (INFLUXDB_CONFIG.get("enabled") and influxdb_client and write_api):
         logger.debug("InfluxDB is disabled or not properly configured; skipping retry of failed writes.")
         return
+    with failed_writes_lock:
+        if not failed_writes_queue:
+            return
 
-    while not failed_writes_queue.empty():
-        bucket, data = failed_writes_queue.get()
-        try:
-            write_api.write(bucket=bucket, record=data)
-            logger.info(f"Retried and succeeded in writing data to InfluxDB bucket '{bucket}'.")
-        except Exception as e:
-            logger.error(f"Failed to write to InfluxDB on retry: {str(e)}. Data will remain in queue.")
-            logger.debug("Exception details:", exc_info=True)
-            failed_writes_queue.put((bucket, data))
-            break  # Exit the loop to prevent infinite retries in case of persistent failure
+    # Back off exponentially, with jitter, while InfluxDB keeps failing instead of retrying every minute
+    if influxdb_healthy is False:
+        if time.monotonic() < next_retry_time:
+            return
+        retry_failure_streak += 1
+        next_retry_time = time.monotonic() + min(60 * 2 ** retry_failure_streak, 3600) + random.uniform(0, 5)
+    else:
+        retry_failure_streak = 0
+
+    # Drain the whole queue at once and resend it as one write per bucket
+    with failed_writes_lock:
+        pending = list(failed_writes_queue)
+        failed_writes_queue.clear()
+    records_by_bucket = {}
+    for bucket, data in pending:
+        records = records_by_bucket.setdefault(bucket, [])
+        if isinstance(data, list):
+            records.extend(data)
+        else:
+            records.append(data)
+
+    # The batching write API only buffers here; a batch that fails again comes back through
+    # on_influxdb_write_error, which re-queues it and marks InfluxDB unhealthy to drive the backoff above
+    for bucket, records in records_by_bucket.items():
+        write_api.write(bucket=bucket, record=records, write_precision=INFLUXDB_WRITE_PRECISION)
+        logger.info(f"Resubmitted {len(records)} queued records for InfluxDB bucket '{bucket}'.")
+
+def check_influxdb_health():
+    """Ping InfluxDB and log whenever its reachability changes."""
+    if not (INFLUXDB_CONFIG.get("enabled") and influxdb_client):
+        return
+    record_influxdb_health(influxdb_client.ping())
+
+def handle_termination_signal(signum, frame):
+    """Turn SIGTERM into a normal shutdown so pending notifications and writes are flushed."""
+    logger.info("Termination signal received. Shutting down.")
+    shutdown_event.set()
 
 # Implement the main execution block
 if __name__ == "__main__":
+    # Service managers and Docker stop the client with SIGTERM, which would otherwise skip cleanup
+    signal.signal(signal.SIGTERM, handle_termination_signal)
+    noise_monitoring_thread = None
     try:
         dev = detect_usb_device(verbose=False)
         if dev is None:
@@ -861,7 +1333,13 @@ if __name__ == "__main__":
         logger.info("Starting Noise Monitoring")
         if PUSHOVER_CONFIG.get("enabled"):
             send_pushover_notification("Noise Buster has started monitoring.")
-        notify_on_start()
+        notify_on_start(dev)
+
+        # Create the image directory once; capture and cleanup rely on it existing
+        os.makedirs(IMAGE_SAVE_PATH, exist_ok=True)
+
+        # Keep the IP camera stream open so captures do not wait for a new connection
+        start_ip_camera_capture()
 
         # Initialize the noise monitoring in a separate thread
         noise_monitoring_thread = threading.Thread(target=update_noise_level)
@@ -871,13 +1349,27 @@ if __name__ == "__main__":
         # Schedule tasks if required
         schedule_tasks()
 
-        while True:
+        # Sleep until the next scheduled job is due instead of polling every second
+        while not shutdown_event.is_set():
             schedule.run_pending()
-            time.sleep(1)
+            idle_seconds = schedule.idle_seconds()
+            if idle_seconds is None:
+                idle_seconds = 60
+            shutdown_event.wait(timeout=min(max(idle_seconds, 0), 60))
     except KeyboardInterrupt:
         logger.info("Manual interruption by user.")
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {str(e)}")
-        logger.debug("Exception details:", exc_info=True)
+        logger.exception(f"An unexpected error occurred: {str(e)}")
         if PUSHOVER_CONFIG.get("enabled"):
             send_pushover_notification(f"Noise Buster encountered an error: {str(e)}")
+    finally:
+        # Stop sampling before anything it writes to is torn down
+        shutdown_event.set()
+        if noise_monitoring_thread is not None:
+            noise_monitoring_thread.join(timeout=5)
+        # Cancel queued jobs and wait for running ones, which may still write to InfluxDB, before it closes
+        scheduled_job_executor.shutdown(wait=True, cancel_futures=True)
+        # Captures only save images, so a running one is left to finish on its own
+        image_executor.shutdown(wait=False, cancel_futures=True)
+        flush_notifications()
+        close_influxdb()